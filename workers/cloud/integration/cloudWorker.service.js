@@ -23,7 +23,7 @@ const axios = require('axios');
  * @param {string} jobData.userId - User ID
  * @param {string} jobData.s3AudioUrl - S3 URL of audio file
  * @param {string} jobData.model - Whisper model (BASE, SMALL, MEDIUM)
- * @param {string} jobData.format - Output format (JSON, SRT, VTT, TXT)
+ * @param {string} jobData.format - Output format (JSON, JSON_FULL, SRT, VTT, TXT)
  * @param {string} [jobData.callbackUrl] - Optional webhook URL for completion
  *
  * @returns {Promise<Object>} Result object
@@ -42,7 +42,7 @@ async function submitToCloudWorker(jobData) {
   }
 
   const validModels = ['BASE', 'SMALL', 'MEDIUM'];
-  const validFormats = ['JSON', 'SRT', 'VTT', 'TXT'];
+  const validFormats = ['JSON', 'JSON_FULL', 'SRT', 'VTT', 'TXT'];
 
   if (!validModels.includes(jobData.model)) {
     throw new Error(`Invalid model: ${jobData.model}. Must be one of: ${validModels.join(', ')}`);
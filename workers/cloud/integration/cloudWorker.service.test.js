@@ -157,7 +157,7 @@ describe('CloudWorkerService', () => {
     it('should accept all valid formats', async () => {
       axios.post.mockResolvedValue({ data: { success: true } });
 
-      for (const format of ['JSON', 'SRT', 'VTT', 'TXT']) {
+      for (const format of ['JSON', 'JSON_FULL', 'SRT', 'VTT', 'TXT']) {
         const job = { ...validJobData, format };
         const result = await submitToCloudWorker(job);
         expect(result.success).toBe(true);
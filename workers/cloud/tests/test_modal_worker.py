@@ -17,9 +17,11 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from modal_worker import (
     format_output,
     format_timestamp_srt,
+    format_timestamps_srt,
     log_info,
     log_error,
-    handle_error
+    handle_error,
+    parse_s3_location
 )
 
 
@@ -50,6 +52,84 @@ class TestFormatTimestamp:
         result = format_timestamp_srt(7384.999)
         assert result == "02:03:04,999"
 
+    def test_vectorized(self):
+        import numpy as np
+
+        result = format_timestamps_srt(np.array([0, 0.5, 125.5, 3725.123, 7384.999]))
+        assert result == [
+            "00:00:00,000",
+            "00:00:00,500",
+            "00:02:05,500",
+            "01:02:05,123",
+            "02:03:04,999"
+        ]
+
+    def test_rounds_to_nearest_millisecond(self):
+        result = format_timestamp_srt(59.9996)
+        assert result == "00:01:00,000"
+
+
+class TestParseS3Location:
+    """Test audio location resolution"""
+
+    def test_bare_key_uses_default_bucket(self):
+        result = parse_s3_location("uploads/user_123/audio.mp3", "whisper-audio")
+        assert result == ("whisper-audio", "uploads/user_123/audio.mp3")
+
+    def test_s3_url(self):
+        result = parse_s3_location("s3://other-bucket/uploads/audio.mp3", "whisper-audio")
+        assert result == ("other-bucket", "uploads/audio.mp3")
+
+    def test_aws_virtual_hosted_url(self):
+        result = parse_s3_location("https://bucket.s3.amazonaws.com/audio/test.mp3", "whisper-audio")
+        assert result == ("bucket", "audio/test.mp3")
+
+    def test_aws_regional_virtual_hosted_url(self):
+        result = parse_s3_location(
+            "https://my.bucket.s3.us-west-2.amazonaws.com/audio/my%20file.mp3",
+            "whisper-audio"
+        )
+        assert result == ("my.bucket", "audio/my file.mp3")
+
+    def test_presigned_url_falls_back(self):
+        result = parse_s3_location(
+            "https://bucket.s3.amazonaws.com/audio/test.mp3?X-Amz-Algorithm=AWS4-HMAC-SHA256&X-Amz-Signature=abc",
+            "whisper-audio"
+        )
+        assert result is None
+
+    def test_aws_url_with_custom_endpoint_falls_back(self):
+        result = parse_s3_location(
+            "https://bucket.s3.amazonaws.com/audio/test.mp3",
+            "whisper-audio",
+            "https://xxx.r2.cloudflarestorage.com"
+        )
+        assert result is None
+
+    def test_aws_path_style_url(self):
+        result = parse_s3_location("https://s3.us-east-1.amazonaws.com/bucket/audio/test.mp3", "whisper-audio")
+        assert result == ("bucket", "audio/test.mp3")
+
+    def test_custom_endpoint_urls(self):
+        endpoint = "https://xxx.r2.cloudflarestorage.com"
+
+        path_style = parse_s3_location(
+            "https://xxx.r2.cloudflarestorage.com/whisper-audio/uploads/a.mp3", "other", endpoint
+        )
+        virtual_hosted = parse_s3_location(
+            "https://whisper-audio.xxx.r2.cloudflarestorage.com/uploads/a.mp3", "other", endpoint
+        )
+
+        assert path_style == ("whisper-audio", "uploads/a.mp3")
+        assert virtual_hosted == ("whisper-audio", "uploads/a.mp3")
+
+    def test_http_url_falls_back(self):
+        assert parse_s3_location("https://example.com/test.mp3", "whisper-audio") is None
+        assert parse_s3_location("http://example.com/test.mp3", "whisper-audio") is None
+
+    def test_other_scheme_is_not_a_key(self):
+        assert parse_s3_location("ftp://host/a.mp3", "whisper-audio") is None
+
 
 class TestFormatOutput:
     """Test output format conversion"""
@@ -82,6 +162,24 @@ class TestFormatOutput:
         assert len(parsed["segments"]) == 2
         assert parsed["language"] == "en"
 
+    def test_json_format_drops_decoder_fields(self, sample_whisper_result):
+        sample_whisper_result["segments"][0]["tokens"] = [50364, 2425, 1002]
+        sample_whisper_result["segments"][0]["avg_logprob"] = -0.21
+
+        parsed = json.loads(format_output(sample_whisper_result, "json"))
+
+        assert parsed["segments"][0] == {"start": 0.0, "end": 2.5, "text": " Hello world."}
+
+    def test_json_full_format(self, sample_whisper_result):
+        sample_whisper_result["segments"][0]["tokens"] = [50364, 2425, 1002]
+        sample_whisper_result["segments"][0]["avg_logprob"] = -0.21
+
+        parsed = json.loads(format_output(sample_whisper_result, "json_full"))
+
+        assert parsed["segments"][0]["tokens"] == [50364, 2425, 1002]
+        assert parsed["segments"][0]["avg_logprob"] == -0.21
+        assert parsed["language"] == "en"
+
     def test_srt_format(self, sample_whisper_result):
         result = format_output(sample_whisper_result, "srt")
 
@@ -174,26 +272,18 @@ class TestLogging:
 class TestHandleError:
     """Test error handling function"""
 
-    @patch('requests.post')
-    @patch('os.path.exists')
-    @patch('os.unlink')
-    def test_handle_error_with_callback(self, mock_unlink, mock_exists, mock_post):
-        mock_exists.return_value = True
-
+    @patch('modal_worker._SESSION.post')
+    def test_handle_error_with_callback(self, mock_post):
         result = handle_error(
             transcription_id="trans_123",
             error_msg="Test error",
-            callback_url="https://api.example.com/callback",
-            audio_path="/tmp/test.mp3"
+            callback_url="https://api.example.com/callback"
         )
 
         # Should return error response
         assert result["success"] is False
         assert result["error"] == "Test error"
 
-        # Should cleanup temp file
-        mock_unlink.assert_called_once_with("/tmp/test.mp3")
-
         # Should send callback
         mock_post.assert_called_once()
         call_args = mock_post.call_args
@@ -201,25 +291,8 @@ class TestHandleError:
         assert call_args[1]["json"]["transcriptionId"] == "trans_123"
         assert call_args[1]["json"]["status"] == "FAILED"
 
-    @patch('os.path.exists')
-    @patch('os.unlink')
-    def test_handle_error_without_callback(self, mock_unlink, mock_exists):
-        mock_exists.return_value = True
-
-        result = handle_error(
-            transcription_id="trans_123",
-            error_msg="Test error",
-            audio_path="/tmp/test.mp3"
-        )
-
-        assert result["success"] is False
-        assert result["error"] == "Test error"
-        mock_unlink.assert_called_once()
-
-    @patch('os.path.exists')
-    def test_handle_error_no_file(self, mock_exists):
-        mock_exists.return_value = False
-
+    @patch('modal_worker._SESSION.post')
+    def test_handle_error_without_callback(self, mock_post):
         result = handle_error(
             transcription_id="trans_123",
             error_msg="Test error"
@@ -227,12 +300,10 @@ class TestHandleError:
 
         assert result["success"] is False
         assert result["error"] == "Test error"
+        mock_post.assert_not_called()
 
-    @patch('requests.post')
-    @patch('os.unlink')
-    @patch('os.path.exists')
-    def test_handle_error_callback_fails_gracefully(self, mock_exists, mock_unlink, mock_post):
-        mock_exists.return_value = False
+    @patch('modal_worker._SESSION.post')
+    def test_handle_error_callback_fails_gracefully(self, mock_post):
         mock_post.side_effect = Exception("Callback failed")
 
         # Should not raise exception even if callback fails